@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+# _install.py - shared filter registration
+
+def install_filters(env, filters, whitelist=None):
+    '''
+    Registers a module's ``name -> filter`` mapping on a Jinja environment,
+    optionally only the names in whitelist. Unknown names raise ValueError.
+    '''
+    if whitelist is None:
+        env.filters.update(filters)
+        return
+    whitelist = set(whitelist)
+    unknown = whitelist.difference(filters)
+    if unknown:
+        raise ValueError('unknown filters: %s' % ', '.join(sorted(unknown)))
+    env.filters.update((k, filters[k]) for k in whitelist)
@@ -1,8 +1,27 @@
 # -*- coding: utf-8 -*-
 # salt.py - filters from saltstack.salt.salt.utils.jinja.py
 
+import bisect
+import hashlib
 import re
+import shlex
 import uuid
+from functools import lru_cache
+from statistics import fmean
+
+from filters._install import install_filters
+
+GLOBAL_UUID = uuid.UUID('91633EBF-1C86-5E33-935A-28061F4B480E')
+_NS_BYTES = GLOBAL_UUID.bytes
+
+# concrete stand-ins for collections.abc.Hashable, cheaper than the ABC check
+_SCALAR_TYPES = (str, bytes, int, float, tuple, frozenset)
+
+_TRUTHY = frozenset(('yes', '1', 'true', 'y', 'on'))
+
+@lru_cache(maxsize=256)
+def _compile(rgx, flag):
+    return re.compile(rgx, flag)
 
 def skip_filter(data):
     '''
@@ -64,15 +83,15 @@ def to_bool(val):
 
         True
     '''
-    if val is None:
+    if val is None or val is False:
         return False
-    if isinstance(val, bool):
-        return val
-    if isinstance(val, (six.text_type, six.string_types)):
-        return val.lower() in ('yes', '1', 'true')
-    if isinstance(val, six.integer_types):
+    if val is True:
+        return True
+    if isinstance(val, str):
+        return val.lower() in _TRUTHY
+    if isinstance(val, int):
         return val > 0
-    if not isinstance(val, collections.Hashable):
+    if isinstance(val, (list, tuple, set, frozenset, dict)):
         return len(val) > 0
     return False
 
@@ -91,7 +110,7 @@ def quote(txt):
 
         'my_text'
     '''
-    return pipes.quote(txt)
+    return shlex.quote(txt)
 
 def regex_escape(value):
     return re.escape(value)
@@ -116,7 +135,7 @@ def regex_search(txt, rgx, ignorecase=False, multiline=False):
         flag |= re.I
     if multiline:
         flag |= re.M
-    obj = re.search(rgx, txt, flag)
+    obj = _compile(rgx, flag).search(txt)
     if not obj:
         return
     return obj.groups()
@@ -141,7 +160,7 @@ def regex_match(txt, rgx, ignorecase=False, multiline=False):
         flag |= re.I
     if multiline:
         flag |= re.M
-    obj = re.match(rgx, txt, flag)
+    obj = _compile(rgx, flag).match(txt)
     if not obj:
         return
     return obj.groups()
@@ -166,8 +185,7 @@ def regex_replace(txt, rgx, val, ignorecase=False, multiline=False):
         flag |= re.I
     if multiline:
         flag |= re.M
-    compiled_rgx = re.compile(rgx, flag)
-    return compiled_rgx.sub(val, txt)
+    return _compile(rgx, flag).sub(val, txt)
 
 def uuid_(val):
     '''
@@ -181,14 +199,16 @@ def uuid_(val):
 
     .. code-block:: text
 
-        f4efeff8-c219-578a-bad7-3dc280612ec8
+        9ade8beb-355a-50d8-9011-1c99848a7719
     '''
-    return six.text_type(
-        uuid.uuid5(
-            GLOBAL_UUID,
-            salt.utils.stringutils.to_str(val)
-        )
-    )
+    if not isinstance(val, bytes):
+        val = str(val).encode('utf-8')
+    # uuid.uuid5 without building the intermediate UUID object
+    b = bytearray(hashlib.sha1(_NS_BYTES + val).digest()[:16])
+    b[6] = (b[6] & 0x0F) | 0x50
+    b[8] = (b[8] & 0x3F) | 0x80
+    h = b.hex()
+    return '%s-%s-%s-%s-%s' % (h[:8], h[8:12], h[12:16], h[16:20], h[20:])
 
 def unique(values):
     '''
@@ -205,15 +225,16 @@ def unique(values):
 
         ['a', 'b', 'c']
     '''
-    ret = None
-    if isinstance(values, collections.Hashable):
-        ret = set(values)
-    else:
+    values = _as_list(values)
+    try:
+        return list(dict.fromkeys(values))
+    except TypeError:
+        # unhashable elements, fall back to an order-preserving scan
         ret = []
         for value in values:
             if value not in ret:
                 ret.append(value)
-    return ret
+        return ret
 
 def lst_min(obj):
     '''
@@ -230,6 +251,10 @@ def lst_min(obj):
 
         1
     '''
+    # array-likes (numpy, pandas) reduce natively instead of per element
+    reduce_ = getattr(obj, 'min', None)
+    if callable(reduce_):
+        return reduce_()
     return min(obj)
 
 def lst_max(obj):
@@ -247,6 +272,10 @@ def lst_max(obj):
 
         4
     '''
+    # array-likes (numpy, pandas) reduce natively instead of per element
+    reduce_ = getattr(obj, 'max', None)
+    if callable(reduce_):
+        return reduce_()
     return max(obj)
 
 def lst_avg(lst):
@@ -264,9 +293,67 @@ def lst_avg(lst):
 
         2.5
     '''
-    if not isinstance(lst, collections.Hashable):
-        return float(sum(lst)/len(lst))
-    return float(lst)
+    if isinstance(lst, (int, float)):
+        return float(lst)
+    mean = getattr(lst, 'mean', None)
+    if callable(mean):
+        return float(mean())
+    return fmean(lst)
+
+def _totally_ordered(ele):
+    '''
+    True for str/int/float (not NaN) and lists/tuples built only from them,
+    the values whose ``<`` is a total order and so safe to bisect.
+    '''
+    if isinstance(ele, (list, tuple)):
+        return all(_totally_ordered(e) for e in ele)
+    if isinstance(ele, float):
+        return ele == ele
+    return isinstance(ele, (str, int))
+
+class _SortedProbe(object):
+    '''
+    Binary-search membership over a sorted copy of totally ordered elements.
+    '''
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        self.items = sorted(items)
+
+    def __contains__(self, ele):
+        if not _totally_ordered(ele):
+            return ele in self.items
+        try:
+            i = bisect.bisect_left(self.items, ele)
+        except TypeError:
+            return ele in self.items
+        return i < len(self.items) and self.items[i] == ele
+
+def _as_list(obj):
+    '''
+    Materialises one-shot iterables (e.g. generators from ``select``).
+    '''
+    if isinstance(obj, (list, tuple)):
+        return obj
+    return list(obj)
+
+def _probe(lst):
+    '''
+    Returns the cheapest container for repeated ``in`` checks against lst:
+    a set, else a sorted copy searched by bisection when the elements are
+    totally ordered, else lst itself.
+    '''
+    lst = _as_list(lst)
+    try:
+        return set(lst)
+    except TypeError:
+        pass
+    if not all(_totally_ordered(ele) for ele in lst):
+        return lst
+    try:
+        return _SortedProbe(lst)
+    except TypeError:
+        return lst
 
 def union(lst1, lst2):
     '''
@@ -283,7 +370,7 @@ def union(lst1, lst2):
 
         [1, 2, 3, 4, 6]
     '''
-    if isinstance(lst1, collections.Hashable) and isinstance(lst2, collections.Hashable):
+    if isinstance(lst1, _SCALAR_TYPES) and isinstance(lst2, _SCALAR_TYPES):
         return set(lst1) | set(lst2)
     return unique(lst1 + lst2)
 
@@ -302,9 +389,10 @@ def intersect(lst1, lst2):
 
         [2, 4]
     '''
-    if isinstance(lst1, collections.Hashable) and isinstance(lst2, collections.Hashable):
+    if isinstance(lst1, _SCALAR_TYPES) and isinstance(lst2, _SCALAR_TYPES):
         return set(lst1) & set(lst2)
-    return unique([ele for ele in lst1 if ele in lst2])
+    probe = _probe(lst2)
+    return unique([ele for ele in lst1 if ele in probe])
 
 def difference(lst1, lst2):
     '''
@@ -321,9 +409,10 @@ def difference(lst1, lst2):
 
         [1, 3, 6]
     '''
-    if isinstance(lst1, collections.Hashable) and isinstance(lst2, collections.Hashable):
+    if isinstance(lst1, _SCALAR_TYPES) and isinstance(lst2, _SCALAR_TYPES):
         return set(lst1) - set(lst2)
-    return unique([ele for ele in lst1 if ele not in lst2])
+    probe = _probe(lst2)
+    return unique([ele for ele in lst1 if ele not in probe])
 
 def symmetric_difference(lst1, lst2):
     '''
@@ -340,25 +429,92 @@ def symmetric_difference(lst1, lst2):
 
         [1, 3]
     '''
-    if isinstance(lst1, collections.Hashable) and isinstance(lst2, collections.Hashable):
+    if isinstance(lst1, _SCALAR_TYPES) and isinstance(lst2, _SCALAR_TYPES):
         return set(lst1) ^ set(lst2)
-    return unique([ele for ele in union(lst1, lst2) if ele not in intersect(lst1, lst2)])
-
-def install(env):
-    env.filters['skip_filter'] = skip_filter
-    env.filters['ensure_sequence_filter'] = ensure_sequence_filter
-    env.filters['to_bool'] = to_bool
-    env.filters['quote'] = quote
-    env.filters['regex_escape'] = regex_escape
-    env.filters['regex_search'] = regex_search
-    env.filters['regex_match'] = regex_match
-    env.filters['regex_replace'] = regex_replace
-    env.filters['uuid_'] = uuid_
-    env.filters['unique'] = unique
-    env.filters['lst_min'] = lst_min
-    env.filters['lst_max'] = lst_max
-    env.filters['lst_avg'] = lst_avg
-    env.filters['union'] = union
-    env.filters['intersect'] = intersect
-    env.filters['difference'] = difference
-    env.filters['symmetric_difference'] = symmetric_difference
+    lst1, lst2 = _as_list(lst1), _as_list(lst2)
+    probe1, probe2 = _probe(lst1), _probe(lst2)
+    return unique([ele for ele in lst1 if ele not in probe2] +
+                  [ele for ele in lst2 if ele not in probe1])
+
+def union_all(*lsts):
+    '''
+    Returns the union of any number of lists.
+
+    .. code-block:: jinja
+
+        {% set my_list = [1,2,3,4] -%}
+        {{ my_list | union_all([2, 4, 6], [5]) }}
+
+    will be rendered as:
+
+    .. code-block:: text
+
+        [1, 2, 3, 4, 6, 5]
+    '''
+    lsts = [_as_list(lst) for lst in lsts]
+    acc = {}
+    try:
+        for lst in lsts:
+            acc.update(dict.fromkeys(lst))
+    except TypeError:
+        return unique([ele for lst in lsts for ele in lst])
+    return list(acc)
+
+def intersect_all(*lsts):
+    '''
+    Returns the intersection of any number of lists.
+
+    .. code-block:: jinja
+
+        {% set my_list = [1,2,3,4] -%}
+        {{ my_list | intersect_all([2, 4, 6], [4, 2]) }}
+
+    will be rendered as:
+
+    .. code-block:: text
+
+        [2, 4]
+    '''
+    if not lsts:
+        return []
+    lsts = [_as_list(lst) for lst in lsts]
+    # prune smallest first, so the running set only ever shrinks from the smallest size
+    try:
+        by_size = sorted(lsts, key=len)
+        acc = set(by_size[0])
+        for lst in by_size[1:]:
+            if not acc:
+                break
+            acc &= set(lst)
+    except TypeError:
+        ret = unique(lsts[0])
+        for lst in lsts[1:]:
+            probe = _probe(lst)
+            ret = [ele for ele in ret if ele in probe]
+        return ret
+    return [ele for ele in unique(lsts[0]) if ele in acc]
+
+_FILTERS = {
+    'skip_filter': skip_filter,
+    'ensure_sequence_filter': ensure_sequence_filter,
+    'to_bool': to_bool,
+    'quote': quote,
+    'regex_escape': regex_escape,
+    'regex_search': regex_search,
+    'regex_match': regex_match,
+    'regex_replace': regex_replace,
+    'uuid_': uuid_,
+    'unique': unique,
+    'lst_min': lst_min,
+    'lst_max': lst_max,
+    'lst_avg': lst_avg,
+    'union': union,
+    'intersect': intersect,
+    'difference': difference,
+    'symmetric_difference': symmetric_difference,
+    'union_all': union_all,
+    'intersect_all': intersect_all,
+}
+
+def install(env, whitelist=None):
+    install_filters(env, _FILTERS, whitelist)
@@ -1,7 +1,52 @@
 # -*- coding: utf-8 -*-
 # tags_list.py - filters from saltstack.salt.salt.utils.jinja.py
 
-def list_with_tag(dct,tag):
+import weakref
+
+from jinja2 import pass_context
+
+from filters._install import install_filters
+
+# template context -> {id(dct): (dct, len(dct), index)}; an index lives for
+# one render and is rebuilt when the dict grows or shrinks mid-render
+_render_indexes = weakref.WeakKeyDictionary()
+
+def _build_tag_index(dct):
+    '''
+    Returns the inverted ``tag -> [keys]`` index of a dict, or None when some
+    value cannot be indexed (strings match substrings, unhashable tags).
+    '''
+    idx = {}
+    try:
+        for k, tags in dct.items():
+            if not isinstance(tags, (list, tuple, set, frozenset, dict)):
+                return None
+            for t in dict.fromkeys(tags):
+                idx.setdefault(t, []).append(k)
+    except TypeError:
+        return None
+    return idx
+
+def _tagged_keys(dct, tag, context=None):
+    '''
+    Returns the keys of dct whose value contains tag. With a template context
+    the index is built once and reused for the rest of that render.
+
+    Adding or removing keys (``{% do d.update(...) %}``) rebuilds the index;
+    editing a tag list in place without changing len(dct) is not noticed,
+    so such templates should treat the tag lists as read-only.
+    '''
+    if context is None:
+        return [k for k,v in dct.items() if tag in v]
+    indexes = _render_indexes.setdefault(context, {})
+    cached = indexes.get(id(dct))
+    if cached is None or cached[0] is not dct or cached[1] != len(dct):
+        cached = indexes[id(dct)] = (dct, len(dct), _build_tag_index(dct))
+    if cached[2] is None:
+        return [k for k,v in dct.items() if tag in v]
+    return list(cached[2].get(tag, ()))
+
+def list_with_tag(dct,tag,context=None):
     '''
     creates a list from a dict with each element having a tag
 
@@ -23,10 +68,10 @@ def list_with_tag(dct,tag):
     [item1, item2]
     '''
     if isinstance(dct, dict) and isinstance(tag,str):
-        return [k for k,v in dct.iteritems() if tag in v]
+        return _tagged_keys(dct, tag, context)
     return dct
 
-def interpolate_list_with_tag(dct,tag,interpolation):
+def interpolate_list_with_tag(dct,tag,interpolation,context=None):
     '''
     returns a modified list from a dict with each element having a tag
 
@@ -48,11 +93,28 @@ def interpolate_list_with_tag(dct,tag,interpolation):
     ['Item: item1', 'Item: item2']
     '''
     if isinstance(dct, dict) and isinstance(tag,str) and isinstance(interpolation,str):
-        return [interpolation % k for k,v in dct.iteritems() if tag in v]
+        keys = _tagged_keys(dct, tag, context)
+        if interpolation.count('%') == 1 and '%s' in interpolation:
+            # a lone %s needs no format machinery
+            prefix, suffix = interpolation.split('%s', 1)
+            return [prefix + str(k) + suffix for k in keys]
+        mod = interpolation.__mod__
+        return [mod(k) for k in keys]
     return dct
 
 
+@pass_context
+def _list_with_tag_filter(context, dct, tag):
+    return list_with_tag(dct, tag, context)
+
+@pass_context
+def _interpolate_list_with_tag_filter(context, dct, tag, interpolation):
+    return interpolate_list_with_tag(dct, tag, interpolation, context)
+
+_FILTERS = {
+    'list_with_tag': _list_with_tag_filter,
+    'interpolate_list_with_tag': _interpolate_list_with_tag_filter,
+}
 
-def install(env):
-    env.filters['list_with_tag'] = list_with_tag
-    env.filters['interpolate_list_with_tag'] = interpolate_list_with_tag
+def install(env, whitelist=None):
+    install_filters(env, _FILTERS, whitelist)
@@ -1,77 +1,76 @@
 #!/usr/bin/env python
 
-import getopt
+import argparse
+import functools
 import jinja2
 import os
 import sys
-import time
 import yaml
 
 import filters
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+_DIR_PATH = os.path.dirname(os.path.abspath(__file__))
+
 # load pillar
 def load_pillar(pillar_file):
     with open(pillar_file, 'r') as stream:
         try:
-            pillar = yaml.load(stream)
+            pillar = yaml.load(stream.read(), Loader=_Loader)
         except yaml.YAMLError as e:
             print(e)
     return pillar
 
-# Common Timestamp Helper
-def timestamp():
-    return time.strftime('%d/%b/%Y:%H:%M:%S %z', time.gmtime())
+# Shared Environment per template directory
+@functools.lru_cache(maxsize=None)
+def get_env(dir_path):
+    env = jinja2.Environment(
+            loader = jinja2.FileSystemLoader(dir_path),
+            auto_reload = False,
+            cache_size = 400,
+            bytecode_cache = jinja2.FileSystemBytecodeCache()
+            )
+    filters.tags.install(env)
+    filters.salt.install(env)
+    return env
 
 
 class JTest:
 
     def __init__(self,pillar,template_file):
-        self.dir_path = os.path.dirname(os.path.realpath(__file__))
-        self.env = jinja2.Environment(
-                loader = jinja2.FileSystemLoader(self.dir_path)
-                )
-        filters.tags.install(self.env)
-        filters.salt.install(self.env)
+        self.dir_path = _DIR_PATH
+        self.env = get_env(self.dir_path)
         self.template = self.env.get_template(template_file)
-        print "Pillar data:\n\t %s" % pillar
-        print "Template:"
-        print self.template.render(pillar)
+        print("Pillar data:\n\t", pillar)
+        print("Template:")
+        stream = self.template.stream(pillar)
+        stream.enable_buffering()
+        stream.dump(sys.stdout)
+        sys.stdout.write('\n')
 
 
 
 
-def usage():
-    print "Usage: %s -p <pillar_file> -t <template_file>\n" % (__file__)
-    print "Options:"
-    print "\t-h, --help\t\tPrints this help"
-    print "\t-d, --demo\t\tRuns with demo files"
-    print "\t-p, --pillar\t\tSpecify the pillar file to use"
-    print "\t-t, --template\t\tSpecify the template to use"
+DEMO_PILLAR = 'pillars/demo.yaml.demo'
+DEMO_TEMPLATE = 'templates/demo.j2.demo'
 
 def main():
-    try:
-        opts, args = getopt.getopt(sys.argv[1:], "hdp:t:", ["help", "demo", "pillar=", "template="])
-    except getopt.GetoptError as err:
-        # print help information and exit:
-        print "\nERROR: %s" % str(err)  # will print something like "option -a not recognized"
-        usage()
-        sys.exit(2)
-    pillar_file = 'pillars/demo.yaml.demo'
-    template_file = 'templates/demo.j2.demo'
-    for o, a in opts:
-        if o in ("-h", "--help"):
-            usage()
-            sys.exit()
-        elif o in ("-d", "--demo"):
-            JTest(pillar, template)
-        elif o in ("-p", "--pillar"):
-            pillar_file = a
-        elif o in ("-t", "--template"):
-            template_file = a
-        else:
-            assert False, "unhandled option"
-    pillar = load_pillar(pillar_file)
-    JTest(pillar,template_file)
+    ap = argparse.ArgumentParser()
+    ap.add_argument('-d', '--demo', action='store_true',
+                    help='Runs with demo files')
+    ap.add_argument('-p', '--pillar', default=DEMO_PILLAR,
+                    help='Specify the pillar file to use')
+    ap.add_argument('-t', '--template', default=DEMO_TEMPLATE,
+                    help='Specify the template to use')
+    args = ap.parse_args()
+    if args.demo:
+        args.pillar, args.template = DEMO_PILLAR, DEMO_TEMPLATE
+    pillar = load_pillar(args.pillar)
+    JTest(pillar, args.template)
 
 
 # Main
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import datetime
+import decimal
+import unittest
+import uuid
+
+from filters import salt
+
+
+class RegexTest(unittest.TestCase):
+
+    def test_search_ignorecase(self):
+        self.assertEqual(
+            salt.regex_search('abcd', '^(.*)BC(.*)$', ignorecase=True),
+            ('a', 'd'))
+        self.assertIsNone(salt.regex_search('abcd', '^(.*)BC(.*)$'))
+
+    def test_match_multiline(self):
+        self.assertIsNone(salt.regex_match('x\nab', '^(a)(b)$', multiline=True))
+        self.assertEqual(salt.regex_search('x\nab', '^(a)(b)$', multiline=True),
+                         ('a', 'b'))
+
+    def test_replace(self):
+        self.assertEqual(salt.regex_replace('lets replace spaces', r'\s+', '__'),
+                         'lets__replace__spaces')
+        self.assertEqual(salt.regex_replace('aA', 'a', '-', ignorecase=True),
+                         '--')
+
+
+class ToBoolTest(unittest.TestCase):
+
+    def test_containers_by_length(self):
+        self.assertTrue(salt.to_bool([1]))
+        self.assertFalse(salt.to_bool({}))
+
+    def test_other_scalars_are_false(self):
+        for val in (datetime.date(2020, 1, 1), decimal.Decimal('1'), object()):
+            self.assertFalse(salt.to_bool(val))
+
+
+class UuidTest(unittest.TestCase):
+
+    def test_matches_uuid5(self):
+        for val in ('example', '', u'\xfcn\xef', 42):
+            self.assertEqual(salt.uuid_(val),
+                             str(uuid.uuid5(salt.GLOBAL_UUID, str(val))))
+        self.assertEqual(salt.uuid_(b'abc'),
+                         str(uuid.uuid5(salt.GLOBAL_UUID, 'abc')))
+
+
+class LstAvgTest(unittest.TestCase):
+
+    def test_scalar(self):
+        self.assertEqual(salt.lst_avg(3), 3.0)
+
+    def test_iterable(self):
+        self.assertEqual(salt.lst_avg([1, 2, 3, 4]), 2.5)
+        self.assertEqual(salt.lst_avg(x for x in (1.5, 2.5)), 2.0)
+
+
+class UniqueTest(unittest.TestCase):
+
+    def test_keeps_order(self):
+        self.assertEqual(salt.unique(['a', 'b', 'c', 'a', 'b']), ['a', 'b', 'c'])
+
+    def test_generator_with_unhashable_item(self):
+        gen = (x for x in [1, [2], 1, 3])
+        self.assertEqual(salt.unique(gen), [1, [2], 3])
+
+
+class IntersectTest(unittest.TestCase):
+
+    def test_keeps_first_operand_order(self):
+        self.assertEqual(salt.intersect([1, 2, 3, 4], [4, 2]), [2, 4])
+        self.assertEqual(salt.intersect([4, 2], [1, 2, 3, 4]), [4, 2])
+
+    def test_accepts_generators(self):
+        gen = (x for x in [1, 2, 3, 4] if x % 2)
+        self.assertEqual(salt.intersect(gen, [3, 5]), [3])
+        gen = (x for x in [1, [2], 3])
+        self.assertEqual(salt.intersect([[2], 3], gen), [[2], 3])
+
+    def test_unhashable_sortable_elements(self):
+        self.assertEqual(salt.intersect([[2], [5]], [[1], [2], [3]]), [[2]])
+        self.assertEqual(salt.difference([[2], [5]], [[1], [2], [3]]), [[5]])
+
+    def test_partially_ordered_elements(self):
+        # sets sort without error but '<' is subset, so bisection would lie
+        self.assertEqual(salt.intersect([{2}], [{1}, {2}, {3}]), [{2}])
+        self.assertEqual(salt.difference([{2}], [{1}, {2}, {3}]), [])
+        self.assertEqual(salt.intersect([[{2}]], [[{1}], [{2}], [{3}]]),
+                         [[{2}]])
+        self.assertEqual(salt.difference([[{2}]], [[{1}], [{2}], [{3}]]), [])
+
+
+class SymmetricDifferenceTest(unittest.TestCase):
+
+    def test_accepts_generators(self):
+        gen = (x for x in [1, 2, 3])
+        self.assertEqual(salt.symmetric_difference(gen, [3, 4]), [1, 2, 4])
+
+
+class MultiSetTest(unittest.TestCase):
+
+    def test_union_all_keeps_first_seen_order(self):
+        self.assertEqual(salt.union_all([1, 2, 3, 4], [2, 4, 6], [5]),
+                         [1, 2, 3, 4, 6, 5])
+
+    def test_union_all_generator_with_unhashable_item(self):
+        gen = (x for x in [1, [2], 1])
+        self.assertEqual(salt.union_all(gen, [3]), [1, [2], 3])
+
+    def test_intersect_all_keeps_first_operand_order(self):
+        self.assertEqual(salt.intersect_all([1, 2, 3, 4], [2, 4, 6], [4, 2]),
+                         [2, 4])
+
+    def test_intersect_all_unhashable(self):
+        self.assertEqual(salt.intersect_all([[1], [2]], [[2]]), [[2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import jinja2
+
+from filters import tags
+
+
+def render(source, **data):
+    env = jinja2.Environment()
+    tags.install(env)
+    return env.from_string(source).render(**data)
+
+
+class ListWithTagTest(unittest.TestCase):
+
+    def test_string_values_match_substrings(self):
+        dct = {'a': 'tag1', 'b': ['tag1']}
+        self.assertEqual(render("{{ d | list_with_tag('tag1') }}", d=dct),
+                         "['a', 'b']")
+
+    def test_unhashable_tags(self):
+        dct = {'a': [{'x': 1}, 'tag1'], 'b': ['tag2']}
+        self.assertEqual(render("{{ d | list_with_tag('tag1') }}", d=dct),
+                         "['a']")
+
+    def test_index_not_reused_across_renders(self):
+        dct = {'a': ['t']}
+        source = "{{ d | list_with_tag('t') }}"
+        self.assertEqual(render(source, d=dct), "['a']")
+        dct['b'] = ['t']
+        self.assertEqual(render(source, d=dct), "['a', 'b']")
+        dct['a'].remove('t')
+        self.assertEqual(render(source, d=dct), "['b']")
+
+    def test_index_rebuilt_when_dict_resized_mid_render(self):
+        dct = {'a': ['t'], 'b': []}
+        source = ("{{ d | list_with_tag('t') }} "
+                  "{% set _ = d.update({'c': ['t']}) %}"
+                  "{% set _ = d['b'].append('t') %}"
+                  "{{ d | list_with_tag('t') }}")
+        self.assertEqual(render(source, d=dct), "['a'] ['a', 'b', 'c']")
+
+    def test_interpolate(self):
+        dct = {'item1': ['tag1', 'tag2'], 'item2': ['tag1']}
+        self.assertEqual(
+            render("{{ d | interpolate_list_with_tag('tag1', 'Item: %s') }}",
+                   d=dct),
+            "['Item: item1', 'Item: item2']")
+
+
+class InstallTest(unittest.TestCase):
+
+    def test_whitelist(self):
+        env = jinja2.Environment()
+        tags.install(env, ['list_with_tag'])
+        self.assertIn('list_with_tag', env.filters)
+        self.assertNotIn('interpolate_list_with_tag', env.filters)
+
+    def test_unknown_whitelist_name(self):
+        with self.assertRaises(ValueError):
+            tags.install(jinja2.Environment(), ['no_such_filter'])
+
+
+if __name__ == '__main__':
+    unittest.main()